@@ -1,9 +1,10 @@
 import os
 import sqlite3
-import random
-from datetime import datetime, timedelta
+from datetime import datetime
 import shutil
 
+import numpy as np
+
 DB_NAME = 'employees.db'
 BACKUP_SUFFIX = '.bak'
 
@@ -11,12 +12,20 @@ BACKUP_SUFFIX = '.bak'
 MIN_DAYS = 30
 MAX_DAYS = 180
 
+# Shared generator, seeded once per run
+_rng = np.random.default_rng()
+
 
 def parse_date(date_str):
     if not date_str:
         return None
-    # Try common formats
-    for fmt in ('%Y-%m-%d', '%Y/%m/%d', '%d-%m-%Y', '%m/%d/%Y', '%Y-%m-%d %H:%M:%S'):
+    # ISO arrival dates go through the C parser
+    try:
+        return datetime.fromisoformat(date_str[:19])
+    except ValueError:
+        pass
+    # Try the remaining formats
+    for fmt in ('%Y/%m/%d', '%d-%m-%Y', '%m/%d/%Y'):
         try:
             return datetime.strptime(date_str[:19], fmt)
         except Exception:
@@ -24,11 +33,12 @@ def parse_date(date_str):
     return None
 
 
-def gen_random_expiry(base: datetime | None) -> str:
-    days = random.randint(MIN_DAYS, MAX_DAYS)
-    anchor = base or datetime.utcnow()
-    dt = anchor + timedelta(days=days)
-    return dt.strftime('%Y-%m-%d')
+def gen_random_expiries(bases: list[datetime | None]) -> list[str]:
+    # Missing arrival dates are anchored to "now", as before
+    now = datetime.utcnow()
+    anchors = np.array([base or now for base in bases], dtype='datetime64[s]')
+    offsets = _rng.integers(MIN_DAYS, MAX_DAYS + 1, size=len(anchors)).astype('timedelta64[D]')
+    return (anchors + offsets).astype('datetime64[D]').astype(str).tolist()
 
 
 def backup_db(db_path: str) -> str:
@@ -51,27 +61,43 @@ def main():
     con = sqlite3.connect(db_path)
     cur = con.cursor()
 
-    # Fetch inventory rows with NULL expiry_date
+    # Remember a few target rows so the run can be audited afterwards
     cur.execute("""
-        SELECT i.inventory_id, i.arrival_date
-        FROM inventory i
-        WHERE i.expiry_date IS NULL
+        SELECT inventory_id
+        FROM inventory
+        WHERE expiry_date IS NULL
+        ORDER BY inventory_id
+        LIMIT 5
     """)
-    rows = cur.fetchall()
-    print(f"Found {len(rows)} inventory rows with NULL expiry_date")
-
-    updated = 0
-    sample = []
+    sample_ids = [row[0] for row in cur.fetchall()]
 
-    for inv_id, arrival in rows:
-        base = parse_date(arrival) if arrival else None
-        expiry = gen_random_expiry(base)
-        cur.execute("UPDATE inventory SET expiry_date = ? WHERE inventory_id = ?", (expiry, inv_id))
-        updated += 1
-        if len(sample) < 5:
-            sample.append((inv_id, arrival, expiry))
+    con.execute("BEGIN")
 
+    # Arrival dates SQLite can parse are backfilled in a single statement
+    cur.execute("""
+        UPDATE inventory
+        SET expiry_date = date(arrival_date, '+' || (abs(random() % ?) + ?) || ' days')
+        WHERE expiry_date IS NULL
+          AND date(arrival_date) IS NOT NULL
+    """, (MAX_DAYS - MIN_DAYS + 1, MIN_DAYS))
+    updated = cur.rowcount
+
+    # Remaining rows (other date formats or no usable date) go through the Python parser
+    cur.execute("SELECT inventory_id, arrival_date FROM inventory WHERE expiry_date IS NULL")
+    rows = cur.fetchall()
+    expiries = gen_random_expiries([parse_date(arrival) for _, arrival in rows])
+    cur.executemany(
+        "UPDATE inventory SET expiry_date = ? WHERE inventory_id = ?",
+        list(zip(expiries, (inv_id for inv_id, _ in rows)))
+    )
+    updated += len(rows)
     con.commit()
+
+    cur.execute(
+        f"SELECT inventory_id, arrival_date, expiry_date FROM inventory WHERE inventory_id IN ({','.join('?' * len(sample_ids))})",
+        sample_ids
+    )
+    sample = cur.fetchall()
     con.close()
 
     print(f"Updated {updated} rows with random expiry dates (between {MIN_DAYS} and {MAX_DAYS} days)")
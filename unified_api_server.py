@@ -1,24 +1,51 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, stream_with_context
 from flask_cors import CORS
+from flask_caching import Cache
+import atexit
+import hmac
+import os
+import queue
 import sqlite3
-from datetime import datetime, timedelta
+import sys
+import threading
+import time
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 import numpy as np
-from collections import defaultdict
-from sklearn.ensemble import RandomForestRegressor
+from collections import OrderedDict, defaultdict
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.linear_model import Ridge
+from threadpoolctl import threadpool_limits
+import bcrypt
+import orjson
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
+cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache'})  # In-process cache for read-mostly lookups
 
 # ============================================================================
 # DATABASE HELPER FUNCTIONS
 # ============================================================================
 
-def get_db_connection():
-    """Get database connection, preferring a DB in the same folder as this server.
+# Connection-scoped tuning applied to every new connection
+_DB_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA cache_size=-65536',
+    'PRAGMA busy_timeout=5000',
+)
+
+# Database files already switched to WAL (journal_mode persists in the file)
+_wal_paths = set()
+
+
+def _resolve_db_path():
+    """Return the DB path, preferring a DB in the same folder as this server.
 
     Fallback: parent folder (legacy layout).
     """
-    import os
     here = os.path.abspath(os.path.dirname(__file__))
     candidates = [
         os.path.join(here, 'employees.db'),
@@ -26,9 +53,237 @@ def get_db_connection():
     ]
     for path in candidates:
         if os.path.exists(path):
-            return sqlite3.connect(path)
+            return path
     # Last resort: connect to path in sibling root (will likely fail if missing)
-    return sqlite3.connect(candidates[0])
+    return candidates[0]
+
+
+def _open_db_connection():
+    """Open a tuned database connection (WAL journal, relaxed sync, larger cache, mmap).
+
+    Pooled connections live for the whole process, so each keeps up to 256 compiled
+    statements (sqlite3's default is 128) keyed by SQL text.
+    """
+    path = _resolve_db_path()
+    conn = sqlite3.connect(path, check_same_thread=False, cached_statements=256)
+    if path not in _wal_paths:
+        conn.execute('PRAGMA journal_mode=WAL')
+        _wal_paths.add(path)
+    for pragma in _DB_PRAGMAS:
+        conn.execute(pragma)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+# Idle connections shared by all request threads (most recently used first). When
+# every pooled connection is checked out a new one is opened; the pool keeps at most
+# _DB_POOL_SIZE of them open and closes any extra on release.
+_DB_POOL_SIZE = 8
+_db_pool = queue.LifoQueue(maxsize=_DB_POOL_SIZE)
+
+
+def get_db_connection():
+    """Check a database connection out of the pool, opening a new one if none is idle."""
+    try:
+        return _db_pool.get_nowait()
+    except queue.Empty:
+        return _open_db_connection()
+
+
+def release_db_connection(conn):
+    """Return a connection to the pool after use.
+
+    Any transaction left open (e.g. an early error return) is rolled back so it
+    cannot leak into the next request that checks the connection out.
+    """
+    if conn.in_transaction:
+        conn.rollback()
+    try:
+        _db_pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+
+@atexit.register
+def _close_pooled_connections():
+    """Close every idle pooled connection at shutdown."""
+    while True:
+        try:
+            _db_pool.get_nowait().close()
+        except queue.Empty:
+            break
+
+
+# Worker threads for running independent read queries concurrently; each query
+# checks out its own pooled connection, and WAL lets them read in parallel
+_query_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='db-query')
+
+
+def run_query(sql, params=()):
+    """Run a read-only query on a connection checked out of the pool and return all rows."""
+    conn = get_db_connection()
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        release_db_connection(conn)
+
+
+@atexit.register
+def _optimize_databases():
+    """Let SQLite refresh planner statistics for every DB used by this process."""
+    for path in _wal_paths:
+        conn = sqlite3.connect(path)
+        conn.execute('PRAGMA optimize')
+        conn.close()
+
+
+# Indexes backing the hot JOIN / ORDER BY paths of the admin and catalog endpoints
+_INDEXES = (
+    'CREATE INDEX IF NOT EXISTS idx_sales_date_id ON sales(SalesDate DESC, SalesID DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_sales_salesperson ON sales(SalesPersonID, SalesDate DESC, SalesID DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_sales_product_date ON sales(ProductID, SalesDate)',
+    'CREATE INDEX IF NOT EXISTS idx_inventory_expiry ON inventory(expiry_date)',
+    'CREATE INDEX IF NOT EXISTS idx_inventory_product ON inventory(product_id, expiry_date)',
+    'CREATE INDEX IF NOT EXISTS idx_pr_status_priority ON procurement_recommendations(status, priority)',
+    'CREATE INDEX IF NOT EXISTS idx_products_category ON products(CategoryID)',
+    'CREATE INDEX IF NOT EXISTS idx_products_name ON products(ProductName COLLATE NOCASE)',
+    'CREATE INDEX IF NOT EXISTS idx_products_name_id ON products(ProductName, ProductID)',
+)
+
+
+def _ensure_indexes(cursor):
+    """Create performance indexes if missing (idempotent)."""
+    for ddl in _INDEXES:
+        cursor.execute(ddl)
+
+
+# Tables holding login credentials: table -> (id column, legacy plaintext password column)
+_CREDENTIAL_TABLES = {
+    'admin': ('AdminID', 'Password'),
+    'customers': ('CustomerID', 'Password'),
+    'employees': ('EmployeeID', 'employee_password'),
+}
+
+
+def _ensure_password_hash_columns(cursor):
+    """Add a PasswordHash column to every credential table if missing (idempotent)."""
+    for table in _CREDENTIAL_TABLES:
+        cursor.execute(f'PRAGMA table_info({table})')
+        if 'PasswordHash' not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN PasswordHash TEXT')
+
+
+def _ensure_po_tables(cursor):
+    """Create purchase order tables if missing (idempotent)."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS purchase_orders (
+            po_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            status TEXT NOT NULL DEFAULT 'DRAFT',
+            created_date TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS purchase_order_items (
+            poi_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            po_id INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            FOREIGN KEY (po_id) REFERENCES purchase_orders(po_id)
+        )
+    ''')
+    # One line per product per PO; also the conflict target for the cart upsert
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_poi_po_product ON purchase_order_items(po_id, product_id)')
+
+
+def init_db():
+    """One-time schema setup run when the server module is loaded."""
+    conn = get_db_connection()
+    try:
+        _ensure_indexes(conn.cursor())
+        _ensure_password_hash_columns(conn.cursor())
+        _ensure_po_tables(conn.cursor())
+        conn.commit()
+    finally:
+        release_db_connection(conn)
+
+
+init_db()
+
+# ============================================================================
+# JSON HELPERS
+# ============================================================================
+
+# Accept NumPy scalars (ML results) and non-string dict keys, as jsonify does
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _json_default(obj):
+    """Serialize types orjson does not handle natively."""
+    if isinstance(obj, sqlite3.Row):
+        return dict(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def json_response(obj, status=200):
+    """Build a JSON response serialized with orjson (used instead of Flask's jsonify)."""
+    return Response(orjson.dumps(obj, default=_json_default, option=_ORJSON_OPTIONS),
+                    status=status, mimetype='application/json')
+
+
+def read_json_body():
+    """Decode the request body with orjson straight from the raw bytes.
+
+    Returns {} for an empty body and None when the body is not valid JSON. Werkzeug
+    is told not to keep its own copy of the body.
+    """
+    raw = request.get_data(cache=False)
+    if not raw:
+        return {}
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return None
+
+# ============================================================================
+# PASSWORD HELPERS
+# ============================================================================
+
+# bcrypt only takes the first 72 bytes into account (and bcrypt>=5 raises ValueError
+# beyond that), so longer passwords are refused at signup and never match at login
+_MAX_PASSWORD_BYTES = 72
+
+
+def password_too_long(password):
+    """Return True if a password cannot be hashed with bcrypt."""
+    return len(str(password).encode()) > _MAX_PASSWORD_BYTES
+
+
+def hash_password(password):
+    """Return the bcrypt hash of a password as text (at most _MAX_PASSWORD_BYTES long)."""
+    return bcrypt.hashpw(str(password).encode(), bcrypt.gensalt()).decode()
+
+
+def verify_password(cursor, table, row_id, password, password_hash, legacy_password):
+    """Check a password for one credential row.
+
+    Rows with a PasswordHash are verified with bcrypt. Rows still holding a
+    legacy plaintext password are compared in constant time and, on success,
+    upgraded in place: the hash is stored and the plaintext column is cleared.
+    """
+    if password is None or password_too_long(password):
+        return False
+    password = str(password).encode()
+    if password_hash:
+        return bcrypt.checkpw(password, password_hash.encode())
+    if not legacy_password or not hmac.compare_digest(str(legacy_password).encode(), password):
+        return False
+    id_column, password_column = _CREDENTIAL_TABLES[table]
+    cursor.execute(
+        f"UPDATE {table} SET PasswordHash=?, {password_column}='' WHERE {id_column}=?",
+        (hash_password(password.decode()), row_id)
+    )
+    cursor.connection.commit()
+    return True
 
 # ============================================================================
 # ADMIN LOGIN FUNCTIONS
@@ -38,24 +293,28 @@ def check_admin_login(email, password):
     """Check if admin credentials are valid"""
     conn = get_db_connection()
     cursor = conn.cursor()
-    # Authenticate against the dedicated `admin` table (Username / Password)
-    # The admin table was added to store admin accounts separately from employees.
-    cursor.execute('SELECT AdminID, FirstName, LastName FROM admin WHERE Username=? AND Password=?', (email, password))
-    result = cursor.fetchone()
-    conn.close()
-    return result is not None
+    try:
+        # Authenticate against the dedicated `admin` table (Username / Password)
+        # The admin table was added to store admin accounts separately from employees.
+        cursor.execute('SELECT AdminID, Password, PasswordHash FROM admin WHERE Username=?', (email,))
+        row = cursor.fetchone()
+        return row is not None and verify_password(cursor, 'admin', row['AdminID'], password, row['PasswordHash'], row['Password'])
+    finally:
+        release_db_connection(conn)
 
 @app.route('/admin-login', methods=['POST'])
 def admin_login():
     """Handle admin login requests"""
-    data = request.get_json()
+    data = read_json_body()
+    if not isinstance(data, dict):
+        return json_response({'error': 'Request body must be a JSON object'}), 400
     email = data.get('email')
     password = data.get('password')
     
     if check_admin_login(email, password):
-        return jsonify({'success': True})
+        return json_response({'success': True})
     else:
-        return jsonify({'success': False}), 401
+        return json_response({'success': False}), 401
 
 # ============================================================================
 # CUSTOMER LOGIN FUNCTIONS
@@ -65,20 +324,25 @@ def check_customer_login(username, password):
     """Check if customer credentials are valid"""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('SELECT * FROM customers WHERE Username=? AND Password=?', (username, password))
-    result = cursor.fetchone()
-    conn.close()
-    return result is not None
+    try:
+        cursor.execute('SELECT CustomerID, Password, PasswordHash FROM customers WHERE Username=?', (username,))
+        row = cursor.fetchone()
+        return row is not None and verify_password(cursor, 'customers', row['CustomerID'], password, row['PasswordHash'], row['Password'])
+    finally:
+        release_db_connection(conn)
 
 
 def get_customer_by_credentials(username, password):
     """Return customer info for valid credentials or None"""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('SELECT CustomerID, FirstName, LastName, Username FROM customers WHERE Username=? AND Password=?', (username, password))
-    row = cursor.fetchone()
-    conn.close()
-    if not row:
+    try:
+        cursor.execute('SELECT CustomerID, FirstName, LastName, Username, Password, PasswordHash FROM customers WHERE Username=?', (username,))
+        row = cursor.fetchone()
+        valid = row is not None and verify_password(cursor, 'customers', row['CustomerID'], password, row['PasswordHash'], row['Password'])
+    finally:
+        release_db_connection(conn)
+    if not valid:
         return None
     return {
         'customerId': row[0],
@@ -90,15 +354,17 @@ def get_customer_by_credentials(username, password):
 @app.route('/customer-login', methods=['POST'])
 def customer_login():
     """Handle customer login requests"""
-    data = request.get_json()
+    data = read_json_body()
+    if not isinstance(data, dict):
+        return json_response({'error': 'Request body must be a JSON object'}), 400
     username = data.get('username')
     password = data.get('password')
     
     customer = get_customer_by_credentials(username, password)
     if customer:
-        return jsonify({'success': True, 'customer': customer})
+        return json_response({'success': True, 'customer': customer})
     else:
-        return jsonify({'success': False}), 401
+        return json_response({'success': False}), 401
 
 
 # ============================================================================
@@ -109,24 +375,29 @@ def check_employee_login(email, password):
     """Simple employee auth by email and password"""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('SELECT EmployeeID, FirstName, LastName FROM employees WHERE employee_email=? AND employee_password=?', (email, password))
-    row = cursor.fetchone()
-    conn.close()
-    if not row:
+    try:
+        cursor.execute('SELECT EmployeeID, FirstName, LastName, employee_password, PasswordHash FROM employees WHERE employee_email=?', (email,))
+        row = cursor.fetchone()
+        valid = row is not None and verify_password(cursor, 'employees', row['EmployeeID'], password, row['PasswordHash'], row['employee_password'])
+    finally:
+        release_db_connection(conn)
+    if not valid:
         return None
     return {'id': row[0], 'first_name': row[1], 'last_name': row[2]}
 
 
 @app.route('/employee-login', methods=['POST'])
 def employee_login():
-    data = request.get_json() or {}
+    data = read_json_body()
+    if not isinstance(data, dict):
+        return json_response({'error': 'Request body must be a JSON object'}), 400
     email = data.get('email')
     password = data.get('password')
     emp = check_employee_login(email, password)
     if emp:
-        return jsonify({'success': True, 'employee': emp})
+        return json_response({'success': True, 'employee': emp})
     else:
-        return jsonify({'success': False}), 401
+        return json_response({'success': False}), 401
 
 
 @app.route('/employee/<int:employee_id>/stats', methods=['GET'])
@@ -138,7 +409,7 @@ def get_employee_stats(employee_id):
         cursor.execute('SELECT EmployeeID, FirstName, LastName, employee_email, Salary, HoursWorked FROM employees WHERE EmployeeID=?', (employee_id,))
         row = cursor.fetchone()
         if not row:
-            return jsonify({'error': 'Employee not found'}), 404
+            return json_response({'error': 'Employee not found'}), 404
 
         employee = {
             'id': row[0],
@@ -159,84 +430,78 @@ def get_employee_stats(employee_id):
             LIMIT 10
         ''', (employee_id,))
         sales = []
-        for r in cursor.fetchall():
+        for r in cursor:
             sales.append({'sale_id': r[0], 'date': r[1], 'product': r[2], 'quantity': r[3], 'revenue': r[4]})
 
         employee['recent_sales'] = sales
-        return jsonify({'employee': employee})
+        return json_response({'employee': employee})
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
     finally:
-        conn.close()
+        release_db_connection(conn)
 
 # ============================================================================
 # CUSTOMER SIGNUP FUNCTIONS
 # ============================================================================
 
-def get_next_customer_id():
-    """Get the next available CustomerID"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT MAX(CustomerID) FROM customers')
-    result = cursor.fetchone()
-    conn.close()
-    return (result[0] or 0) + 1
-
 def check_username_exists(username):
     """Check if username already exists"""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('SELECT COUNT(*) FROM customers WHERE Username=?', (username,))
+    cursor.execute('SELECT 1 FROM customers WHERE Username=? LIMIT 1', (username,))
     result = cursor.fetchone()
-    conn.close()
-    return result[0] > 0
+    release_db_connection(conn)
+    return result is not None
 
 def register_customer(customer_data):
-    """Register a new customer in the database"""
+    """Register a new customer in the database and return the new CustomerID (None on failure)"""
     conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
+        # CustomerID is the INTEGER PRIMARY KEY (rowid alias): SQLite assigns it atomically
         cursor.execute('''
-            INSERT INTO customers (CustomerID, FirstName, MiddleInitial, LastName, CityID, Address, Username, Password)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO customers (FirstName, MiddleInitial, LastName, CityID, Address, Username, Password, PasswordHash)
+            VALUES (?, ?, ?, ?, ?, ?, '', ?)
         ''', (
-            customer_data['CustomerID'],
             customer_data['FirstName'],
             customer_data['MiddleInitial'],
             customer_data['LastName'],
             customer_data['CityID'],
             customer_data['Address'],
             customer_data['Username'],
-            customer_data['Password']
+            hash_password(customer_data['Password'])
         ))
         
         conn.commit()
-        conn.close()
-        return True
+        release_db_connection(conn)
+        return cursor.lastrowid
     except Exception as e:
-        conn.close()
+        release_db_connection(conn)
         print(f"Database error: {e}")
-        return False
+        return None
 
 @app.route('/customer-signup', methods=['POST'])
 def customer_signup():
     """Handle customer registration requests"""
-    data = request.get_json()
+    data = read_json_body()
+    if not isinstance(data, dict):
+        return json_response({'error': 'Request body must be a JSON object'}), 400
     
     # Extract and validate required fields
     required_fields = ['firstName', 'lastName', 'address', 'cityId', 'username', 'password']
     for field in required_fields:
         if field not in data or not str(data[field]).strip():
-            return jsonify({'success': False, 'message': f'Missing required field: {field}'}), 400
+            return json_response({'success': False, 'message': f'Missing required field: {field}'}), 400
+    if password_too_long(data['password']):
+        return json_response({'success': False, 'message': f'Password must be at most {_MAX_PASSWORD_BYTES} bytes'}), 400
     
     # Check if username already exists
     if check_username_exists(data['username']):
-        return jsonify({'success': False, 'message': 'Username already exists'}), 400
+        return json_response({'success': False, 'message': 'Username already exists'}), 400
     
     # Prepare customer data
     customer_data = {
-        'CustomerID': get_next_customer_id(),
         'FirstName': str(data['firstName']).strip(),
         'MiddleInitial': str(data.get('middleInitial', '')).strip() or None,
         'LastName': str(data['lastName']).strip(),
@@ -247,26 +512,29 @@ def customer_signup():
     }
     
     # Register the customer
-    if register_customer(customer_data):
-        return jsonify({
+    customer_id = register_customer(customer_data)
+    if customer_id is not None:
+        return json_response({
             'success': True, 
             'message': 'Account created successfully!',
-            'customerId': customer_data['CustomerID']
+            'customerId': customer_id
         })
     else:
-        return jsonify({'success': False, 'message': 'Failed to create account'}), 500
+        return json_response({'success': False, 'message': 'Failed to create account'}), 500
 
 @app.route('/check-username', methods=['POST'])
 def check_username():
     """Check if username is available"""
-    data = request.get_json()
+    data = read_json_body()
+    if not isinstance(data, dict):
+        return json_response({'error': 'Request body must be a JSON object'}), 400
     username = str(data.get('username', '')).strip()
     
     if not username:
-        return jsonify({'available': False, 'message': 'Username is required'})
+        return json_response({'available': False, 'message': 'Username is required'})
     
     available = not check_username_exists(username)
-    return jsonify({
+    return json_response({
         'available': available,
         'message': 'Username is available' if available else 'Username already taken'
     })
@@ -275,23 +543,29 @@ def check_username():
 # PRODUCT CATALOG FUNCTIONS
 # ============================================================================
 
-@app.route('/products', methods=['GET'])
-def get_products():
-    """Get all products with category information"""
+@lru_cache(maxsize=256)
+def _fetch_products(category_id, search, match, page, per_page, after=None):
+    """Run the catalog query for one filter/page combination.
+
+    When `after` (the last ProductID of the previous page) is given, the page is
+    fetched by keyset instead of OFFSET. Returns (total_count, columns, rows) made
+    of tuples so the result is immutable and safe to memoize. Call
+    _fetch_products.cache_clear() after product writes.
+    """
     conn = get_db_connection()
     cursor = conn.cursor()
-    
-    # Get query parameters for filtering and pagination
-    category_id = request.args.get('category_id')
-    search = request.args.get('search', '')
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 20))
     offset = (page - 1) * per_page
     
-    # Build query with optional filters
+    # Build query with optional filters. OFFSET pages carry the total as a trailing
+    # window column; keyset pages leave it out so the LIMIT can stop the index walk
     base_query = '''
-        SELECT p.ProductID, p.ProductName, p.Price, p.CategoryID, p.Class, 
-               p.Resistant, p.IsAllergic, p.VitalityDays, c.CategoryName
+        SELECT p.ProductID AS id, p.ProductName AS name, p.Price AS price,
+               p.CategoryID AS category_id, p.Class AS class, p.Resistant AS resistant,
+               p.IsAllergic AS is_allergic, p.VitalityDays AS vitality_days,
+               c.CategoryName AS category_name'''
+    if after is None:
+        base_query += ', COUNT(*) OVER () AS total_count'
+    base_query += '''
         FROM products p
         JOIN categories c ON p.CategoryID = c.CategoryID
     '''
@@ -303,80 +577,109 @@ def get_products():
         conditions.append('p.CategoryID = ?')
         params.append(category_id)
     
-    if search:
+    if search and match == 'prefix':
+        # Anchored, case-insensitive prefix match served by idx_products_name
+        escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        conditions.append("p.ProductName LIKE ? ESCAPE '\\'")
+        params.append(f'{escaped}%')
+    elif search:
         conditions.append('(p.ProductName LIKE ? OR c.CategoryName LIKE ?)')
         params.extend([f'%{search}%', f'%{search}%'])
     
+    filter_conditions = list(conditions)
+    filter_params = list(params)
+    
+    if after is not None:
+        # Seek straight past the previous page's last (name, id) via idx_products_name_id
+        conditions.append('(p.ProductName, p.ProductID) > '
+                          '(SELECT ProductName, ProductID FROM products WHERE ProductID = ?)')
+        params.append(after)
+    
     if conditions:
         base_query += ' WHERE ' + ' AND '.join(conditions)
     
-    base_query += ' ORDER BY p.ProductName LIMIT ? OFFSET ?'
-    params.extend([per_page, offset])
+    base_query += ' ORDER BY p.ProductName, p.ProductID'
+    if after is not None:
+        base_query += ' LIMIT ?'
+        params.append(per_page)
+    else:
+        base_query += ' LIMIT ? OFFSET ?'
+        params.extend([per_page, offset])
     
     cursor.execute(base_query, params)
-    products = cursor.fetchall()
-    
-    # Get total count for pagination
-    count_query = 'SELECT COUNT(*) FROM products p JOIN categories c ON p.CategoryID = c.CategoryID'
-    if conditions:
-        # Use the same conditions as in the main query; only remove LIMIT/OFFSET params
-        count_query += ' WHERE ' + ' AND '.join(conditions)
-        count_params = params[:-2]  # drop per_page and offset
-        cursor.execute(count_query, count_params)
+    columns = tuple(d[0] for d in cursor.description)
+    rows = cursor.fetchall()
+    # Product columns end before the trailing total_count column, when it is selected
+    width = len(columns) - 1 if after is None else len(columns)
+    
+    # Total count for pagination comes back on every row of an OFFSET page
+    if rows and after is None:
+        total_count = rows[0]['total_count']
+    elif page > 1 or after is not None:
+        # No row carries the full total, so count separately
+        count_query = 'SELECT COUNT(*) FROM products p JOIN categories c ON p.CategoryID = c.CategoryID'
+        if filter_conditions:
+            count_query += ' WHERE ' + ' AND '.join(filter_conditions)
+        cursor.execute(count_query, filter_params)
+        total_count = cursor.fetchone()[0]
     else:
-        cursor.execute(count_query)
-    
-    total_count = cursor.fetchone()[0]
-    conn.close()
-    
-    # Format products for response
-    products_list = []
-    for product in products:
-        products_list.append({
-            'id': product[0],
-            'name': product[1],
-            'price': product[2],
-            'category_id': product[3],
-            'class': product[4],
-            'resistant': product[5],
-            'is_allergic': product[6],
-            'vitality_days': product[7],
-            'category_name': product[8]
-        })
+        total_count = 0
+    release_db_connection(conn)
+    
+    return total_count, columns[:width], tuple(tuple(row)[:width] for row in rows)
+    
+
+@app.route('/products', methods=['GET'])
+@cache.cached(timeout=60, query_string=True)
+def get_products():
+    """Get all products with category information"""
+    # Get query parameters for filtering and pagination
+    category_id = request.args.get('category_id')
+    search = request.args.get('search', '')
+    match = request.args.get('match', 'contains')  # 'contains' or 'prefix'
+    page = int(request.args.get('page', 1))
+    per_page = int(request.args.get('per_page', 20))
+    after = request.args.get('cursor', type=int)  # last product id of the previous page
     
-    return jsonify({
+    total_count, columns, rows = _fetch_products(category_id, search, match, page, per_page, after)
+    products_list = [dict(zip(columns, row)) for row in rows]
+    
+    return json_response({
         'products': products_list,
         'pagination': {
             'page': page,
             'per_page': per_page,
             'total': total_count,
-            'pages': (total_count + per_page - 1) // per_page
+            'pages': (total_count + per_page - 1) // per_page,
+            'next_cursor': products_list[-1]['id'] if len(products_list) == per_page else None
         }
     })
 
 @app.route('/categories', methods=['GET'])
+@cache.cached(timeout=3600)
 def get_categories():
     """Get all categories"""
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute('SELECT CategoryID, CategoryName FROM categories ORDER BY CategoryName')
     categories = cursor.fetchall()
-    conn.close()
+    release_db_connection(conn)
     
     categories_list = [{'id': cat[0], 'name': cat[1]} for cat in categories]
-    return jsonify({'categories': categories_list})
+    return json_response({'categories': categories_list})
 
 @app.route('/cities', methods=['GET'])
+@cache.cached(timeout=3600)
 def get_cities():
     """Get all cities for dropdowns"""
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute('SELECT CityID, CityName FROM cities ORDER BY CityName')
     cities = cursor.fetchall()
-    conn.close()
+    release_db_connection(conn)
     
     cities_list = [{'id': city[0], 'name': city[1]} for city in cities]
-    return jsonify({'cities': cities_list})
+    return json_response({'cities': cities_list})
 
 @app.route('/product/<int:product_id>', methods=['GET'])
 def get_product_details(product_id):
@@ -392,12 +695,12 @@ def get_product_details(product_id):
     ''', (product_id,))
     
     product = cursor.fetchone()
-    conn.close()
+    release_db_connection(conn)
     
     if not product:
-        return jsonify({'error': 'Product not found'}), 404
+        return json_response({'error': 'Product not found'}), 404
     
-    return jsonify({
+    return json_response({
         'id': product[0],
         'name': product[1],
         'price': product[2],
@@ -417,35 +720,22 @@ def get_product_details(product_id):
 @app.route('/admin/dashboard-stats', methods=['GET'])
 def get_dashboard_stats():
     """Get overall dashboard statistics"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
-        # Get counts from all tables
-        cursor.execute('SELECT COUNT(*) FROM employees')
-        employee_count = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM customers')
-        customer_count = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM products')
-        product_count = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM categories')
-        category_count = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM cities')
-        city_count = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM sales')
-        sales_count = cursor.fetchone()[0]
-        
-        # Get total revenue
-        cursor.execute('SELECT SUM(s.Quantity * p.Price) FROM sales s JOIN products p ON s.ProductID = p.ProductID')
-        total_revenue = cursor.fetchone()[0] or 0
+        # The queries below are independent, so they run concurrently on the query pool.
+        # Get counts from all tables and total revenue in a single round trip
+        counts_future = _query_executor.submit(run_query, '''
+            SELECT
+                (SELECT COUNT(*) FROM employees),
+                (SELECT COUNT(*) FROM customers),
+                (SELECT COUNT(*) FROM products),
+                (SELECT COUNT(*) FROM categories),
+                (SELECT COUNT(*) FROM cities),
+                (SELECT COUNT(*) FROM sales),
+                (SELECT SUM(s.Quantity * p.Price) FROM sales s JOIN products p ON s.ProductID = p.ProductID)
+        ''')
         
         # Get top selling products
-        cursor.execute('''
+        top_products_future = _query_executor.submit(run_query, '''
             SELECT p.ProductName, SUM(s.Quantity) as total_sold
             FROM sales s 
             JOIN products p ON s.ProductID = p.ProductID 
@@ -453,10 +743,9 @@ def get_dashboard_stats():
             ORDER BY total_sold DESC 
             LIMIT 5
         ''')
-        top_products = [{'name': row[0], 'sold': row[1]} for row in cursor.fetchall()]
         
         # Get sales by category
-        cursor.execute('''
+        category_sales_future = _query_executor.submit(run_query, '''
             SELECT c.CategoryName, SUM(s.Quantity) as total_sold
             FROM sales s 
             JOIN products p ON s.ProductID = p.ProductID 
@@ -464,10 +753,9 @@ def get_dashboard_stats():
             GROUP BY c.CategoryID, c.CategoryName 
             ORDER BY total_sold DESC
         ''')
-        category_sales = [{'category': row[0], 'sold': row[1]} for row in cursor.fetchall()]
         
         # Get monthly sales trend (all available data, limited to most recent 12 months)
-        cursor.execute('''
+        monthly_trend_future = _query_executor.submit(run_query, '''
             SELECT strftime('%Y-%m', s.SalesDate) as month, 
                    SUM(s.Quantity * p.Price) as revenue
             FROM sales s 
@@ -477,11 +765,17 @@ def get_dashboard_stats():
             ORDER BY month DESC
             LIMIT 12
         ''')
-        rows = cursor.fetchall()
+        
+        (employee_count, customer_count, product_count, category_count,
+         city_count, sales_count, total_revenue) = counts_future.result()[0]
+        total_revenue = total_revenue or 0
+        top_products = [{'name': row[0], 'sold': row[1]} for row in top_products_future.result()]
+        category_sales = [{'category': row[0], 'sold': row[1]} for row in category_sales_future.result()]
+        rows = monthly_trend_future.result()
         # Reverse to show chronological order, filter out any null months
         monthly_trend = [{'month': row[0], 'revenue': row[1]} for row in reversed(rows) if row[0]]
         
-        return jsonify({
+        return json_response({
             'counts': {
                 'employees': employee_count,
                 'customers': customer_count,
@@ -499,9 +793,7 @@ def get_dashboard_stats():
         })
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
-    finally:
-        conn.close()
+        return json_response({'error': str(e)}), 500
 
 @app.route('/admin/employees', methods=['GET'])
 def get_admin_employees():
@@ -511,37 +803,27 @@ def get_admin_employees():
     
     try:
         cursor.execute('''
-            SELECT e.EmployeeID, e.FirstName, e.LastName, e.employee_email, 
-                   e.Gender, c.CityName, e.MiddleInitial, e.Salary, e.HoursWorked
+            SELECT e.EmployeeID AS id, e.FirstName AS first_name, e.LastName AS last_name,
+                   e.employee_email AS email, e.Gender AS gender, c.CityName AS city_name,
+                   e.MiddleInitial AS middle_initial, CAST(e.Salary AS REAL) AS salary,
+                   CAST(e.HoursWorked AS REAL) AS hours_worked
             FROM employees e
             JOIN cities c ON e.CityID = c.CityID
             ORDER BY e.EmployeeID
         ''')
         
-        employees = []
-        for row in cursor.fetchall():
-            employees.append({
-                'id': row[0],
-                'first_name': row[1],
-                'last_name': row[2],
-                'email': row[3],
-                'gender': row[4],
-                'city_name': row[5],
-                'middle_initial': row[6],
-                'salary': float(row[7]) if row[7] is not None else None,
-                'hours_worked': float(row[8]) if row[8] is not None else None
-            })
+        employees = [dict(row) for row in cursor]
         
-        return jsonify({'employees': employees})
+        return json_response({'employees': employees})
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
     finally:
-        conn.close()
+        release_db_connection(conn)
 
 @app.route('/admin/recent-sales', methods=['GET'])
 def get_recent_sales():
-    """Get recent sales transactions"""
+    """Get recent sales transactions, streamed row by row from the cursor"""
     limit = request.args.get('limit', 50, type=int)
     
     conn = get_db_connection()
@@ -549,10 +831,10 @@ def get_recent_sales():
     
     try:
         cursor.execute('''
-            SELECT s.SalesID, s.SalesDate, p.ProductName as product_name, 
-                   c.CategoryName as category_name, s.Quantity, p.Price,
-                   (s.Quantity * p.Price) as total_amount,
-                   ci.CityName, s.CustomerID
+            SELECT s.SalesID AS sale_id, s.SalesDate AS sale_date, p.ProductName AS product_name, 
+                   c.CategoryName AS category_name, s.Quantity AS quantity, p.Price AS price,
+                   (s.Quantity * p.Price) AS total_amount,
+                   ci.CityName AS city, s.CustomerID AS customer_id
             FROM sales s
             JOIN products p ON s.ProductID = p.ProductID
             JOIN categories c ON p.CategoryID = c.CategoryID
@@ -561,27 +843,20 @@ def get_recent_sales():
             ORDER BY s.SalesDate DESC, s.SalesID DESC
             LIMIT ?
         ''', (limit,))
-        
-        sales = []
-        for row in cursor.fetchall():
-            sales.append({
-                'sale_id': row[0],
-                'sale_date': row[1],
-                'product_name': row[2],
-                'category_name': row[3],
-                'quantity': row[4],
-                'price': row[5],
-                'total_amount': row[6],
-                'city': row[7],
-                'customer_id': row[8]
-            })
-        
-        return jsonify({'sales': sales})
-        
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
-    finally:
-        conn.close()
+        release_db_connection(conn)
+        return json_response({'error': str(e)}), 500
+    
+    def generate():
+        yield b'{"sales":['
+        for i, row in enumerate(cursor):
+            yield (b',' if i else b'') + orjson.dumps(dict(row), option=_ORJSON_OPTIONS)
+        yield b']}'
+    
+    response = Response(stream_with_context(generate()), mimetype='application/json')
+    # Released when the response closes, even if the body is never iterated (HEAD, client gone)
+    response.call_on_close(lambda: release_db_connection(conn))
+    return response
 
 @app.route('/admin/products', methods=['GET'])
 def get_admin_products():
@@ -593,33 +868,23 @@ def get_admin_products():
     
     try:
         cursor.execute('''
-            SELECT p.ProductID, p.ProductName, p.Price, c.CategoryName,
-                   p.Class, p.Resistant, p.IsAllergic, p.VitalityDays
+            SELECT p.ProductID AS id, p.ProductName AS name, p.Price AS price,
+                   c.CategoryName AS category_name, p.Class AS class, p.Resistant AS resistant,
+                   p.IsAllergic AS is_allergic, p.VitalityDays AS vitality_days
             FROM products p
             JOIN categories c ON p.CategoryID = c.CategoryID
             ORDER BY p.ProductID
             LIMIT ?
         ''', (limit,))
         
-        products = []
-        for row in cursor.fetchall():
-            products.append({
-                'id': row[0],
-                'name': row[1],
-                'price': row[2],
-                'category_name': row[3],
-                'class': row[4],
-                'resistant': row[5],
-                'is_allergic': row[6],
-                'vitality_days': row[7]
-            })
+        products = [dict(row) for row in cursor]
         
-        return jsonify({'products': products})
+        return json_response({'products': products})
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
     finally:
-        conn.close()
+        release_db_connection(conn)
 
 # ============================================================================
 # UTILITY ENDPOINTS
@@ -629,19 +894,14 @@ def get_admin_products():
 # INVENTORY MANAGEMENT APIs
 # ============================================================================
 
-@app.route('/inventory/stock-levels', methods=['GET'])
-def get_stock_levels():
-    """Get current stock levels for all products"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
+# Statement texts are built once at import rather than per request
+_STOCK_LEVELS_SQL = """
         SELECT 
-            p.ProductID,
-            p.ProductName,
-            p.Price,
-            c.CategoryName,
-            p.VitalityDays,
+            p.ProductID as product_id,
+            p.ProductName as product_name,
+            p.Price as price,
+            c.CategoryName as category,
+            p.VitalityDays as shelf_life_days,
             COALESCE(SUM(i.quantity), 0) as current_stock,
             COUNT(DISTINCT i.inventory_id) as batch_count,
             MIN(i.expiry_date) as nearest_expiry
@@ -649,102 +909,134 @@ def get_stock_levels():
         LEFT JOIN categories c ON p.CategoryID = c.CategoryID
         LEFT JOIN inventory i ON p.ProductID = i.product_id
         GROUP BY p.ProductID
-        ORDER BY current_stock ASC
-    """)
-    
-    columns = ['product_id', 'product_name', 'price', 'category', 'shelf_life_days', 
-               'current_stock', 'batch_count', 'nearest_expiry']
-    rows = cursor.fetchall()
-    conn.close()
-    
-    return jsonify([dict(zip(columns, row)) for row in rows])
+"""
+_STOCK_LEVELS_BY_STOCK_SQL = _STOCK_LEVELS_SQL + "        ORDER BY current_stock ASC\n"
+_STOCK_LEVELS_BATCH = 1000
 
 
-@app.route('/inventory/expiring-soon', methods=['GET'])
-def get_expiring_stock():
-    """Get stock expiring within the next N days (default 7)"""
-    days = request.args.get('days', 7, type=int)
+@app.route('/inventory/stock-levels', methods=['GET'])
+@cache.cached(timeout=30, query_string=True, unless=lambda: request.args.get('sort') != 'stock')
+def get_stock_levels():
+    """Get current stock levels for all products (only ?sort=stock is cached, for 30s)"""
+    sort = request.args.get('sort', 'none')  # 'none' (product order) or 'stock' (ascending stock)
     
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    cursor.execute("""
+    cursor.arraysize = _STOCK_LEVELS_BATCH
+    cursor.execute(_STOCK_LEVELS_BY_STOCK_SQL if sort == 'stock' else _STOCK_LEVELS_SQL)
+    
+    # Convert rows batch by batch so only one batch of sqlite3.Row objects is alive at a time
+    rows = []
+    for batch in iter(cursor.fetchmany, []):
+        rows.extend(map(dict, batch))
+    release_db_connection(conn)
+    
+    return json_response(rows)
+
+
+_EXPIRING_STOCK_FROM = """
+        FROM inventory i
+        JOIN products p ON i.product_id = p.ProductID
+        JOIN categories c ON p.CategoryID = c.CategoryID
+        JOIN suppliers s ON i.supplier_id = s.supplier_id
+        WHERE i.expiry_date IS NOT NULL
+          AND i.expiry_date BETWEEN date('now') AND date('now', '+' || ? || ' days')
+"""
+_EXPIRING_STOCK_SQL = """
         SELECT 
             i.inventory_id,
             i.batch_number,
-            p.ProductName,
-            c.CategoryName,
+            p.ProductName as product_name,
+            c.CategoryName as category,
             i.quantity,
             i.arrival_date,
             i.expiry_date,
-            s.supplier_name,
+            s.supplier_name as supplier,
             CAST((julianday(i.expiry_date) - julianday('now')) AS INTEGER) as days_until_expiry
-        FROM inventory i
-        JOIN products p ON i.product_id = p.ProductID
-        JOIN categories c ON p.CategoryID = c.CategoryID
-        JOIN suppliers s ON i.supplier_id = s.supplier_id
-        WHERE i.expiry_date IS NOT NULL
-          AND i.expiry_date BETWEEN date('now') AND date('now', '+' || ? || ' days')
+""" + _EXPIRING_STOCK_FROM + """
         ORDER BY i.expiry_date ASC
-    """, (days,))
+"""
+_EXPIRING_STOCK_UNITS_SQL = 'SELECT COALESCE(SUM(i.quantity), 0)' + _EXPIRING_STOCK_FROM
+
+
+@app.route('/inventory/expiring-soon', methods=['GET'])
+def get_expiring_stock():
+    """Get stock expiring within the next N days (default 7)"""
+    days = request.args.get('days', 7, type=int)
     
-    columns = ['inventory_id', 'batch_number', 'product_name', 'category', 'quantity',
-               'arrival_date', 'expiry_date', 'supplier', 'days_until_expiry']
-    rows = cursor.fetchall()
-    conn.close()
+    conn = get_db_connection()
+    cursor = conn.cursor()
     
-    return jsonify({
+    # Read the batches and their unit total from one snapshot
+    conn.execute('BEGIN')
+    cursor.execute(_EXPIRING_STOCK_SQL, (days,))
+    rows = [dict(row) for row in cursor]
+    
+    cursor.execute(_EXPIRING_STOCK_UNITS_SQL, (days,))
+    total_units = cursor.fetchone()[0]
+    release_db_connection(conn)  # also ends the read transaction
+    
+    return json_response({
         'days_threshold': days,
         'total_batches': len(rows),
-        'total_units': sum(row[4] for row in rows),
-        'expiring_items': [dict(zip(columns, row)) for row in rows]
+        'total_units': total_units,
+        'expiring_items': rows
     })
 
 
-@app.route('/inventory/expired', methods=['GET'])
-def get_expired_stock():
-    """Get already expired stock"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT 
-            i.inventory_id,
-            i.batch_number,
-            p.ProductName,
-            c.CategoryName,
-            i.quantity,
-            i.expiry_date,
-            s.supplier_name,
-            CAST((julianday('now') - julianday(i.expiry_date)) AS INTEGER) as days_expired
+_EXPIRED_STOCK_FROM = """
         FROM inventory i
         JOIN products p ON i.product_id = p.ProductID
         JOIN categories c ON p.CategoryID = c.CategoryID
         JOIN suppliers s ON i.supplier_id = s.supplier_id
         WHERE i.expiry_date IS NOT NULL
           AND i.expiry_date < date('now')
+"""
+_EXPIRED_STOCK_SQL = """
+        SELECT 
+            i.inventory_id,
+            i.batch_number,
+            p.ProductName as product_name,
+            c.CategoryName as category,
+            i.quantity,
+            i.expiry_date,
+            s.supplier_name as supplier,
+            CAST((julianday('now') - julianday(i.expiry_date)) AS INTEGER) as days_expired
+""" + _EXPIRED_STOCK_FROM + """
         ORDER BY i.expiry_date ASC
-    """)
+"""
+_EXPIRED_STOCK_UNITS_SQL = 'SELECT COALESCE(SUM(i.quantity), 0)' + _EXPIRED_STOCK_FROM
+
+
+@app.route('/inventory/expired', methods=['GET'])
+def get_expired_stock():
+    """Get already expired stock"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
     
-    columns = ['inventory_id', 'batch_number', 'product_name', 'category', 'quantity',
-               'expiry_date', 'supplier', 'days_expired']
-    rows = cursor.fetchall()
-    conn.close()
+    # Read the batches and their unit total from one snapshot
+    conn.execute('BEGIN')
+    cursor.execute(_EXPIRED_STOCK_SQL)
+    rows = [dict(row) for row in cursor]
     
-    return jsonify({
+    cursor.execute(_EXPIRED_STOCK_UNITS_SQL)
+    total_units = cursor.fetchone()[0]
+    release_db_connection(conn)  # also ends the read transaction
+    
+    return json_response({
         'total_batches': len(rows),
-        'total_units': sum(row[4] for row in rows),
-        'expired_items': [dict(zip(columns, row)) for row in rows]
+        'total_units': total_units,
+        'expired_items': rows
     })
 
 
-@app.route('/inventory/product/<int:product_id>', methods=['GET'])
-def get_product_inventory(product_id):
-    """Get all inventory batches for a specific product"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
+_PRODUCT_BATCHES_FROM = """
+        FROM inventory i
+        JOIN suppliers s ON i.supplier_id = s.supplier_id
+        WHERE i.product_id = ?
+"""
+_PRODUCT_BATCHES_SQL = """
         SELECT 
             i.inventory_id,
             i.batch_number,
@@ -759,36 +1051,40 @@ def get_product_inventory(product_id):
                 WHEN i.expiry_date < date('now', '+7 days') THEN 'EXPIRING SOON'
                 ELSE 'GOOD'
             END as status
-        FROM inventory i
-        JOIN suppliers s ON i.supplier_id = s.supplier_id
-        WHERE i.product_id = ?
+""" + _PRODUCT_BATCHES_FROM + """
         ORDER BY 
             CASE 
                 WHEN i.expiry_date IS NULL THEN 999999
                 ELSE julianday(i.expiry_date) - julianday('now')
             END ASC
-    """, (product_id,))
+"""
+_PRODUCT_BATCHES_UNITS_SQL = 'SELECT COALESCE(SUM(i.quantity), 0)' + _PRODUCT_BATCHES_FROM
+
+
+@app.route('/inventory/product/<int:product_id>', methods=['GET'])
+def get_product_inventory(product_id):
+    """Get all inventory batches for a specific product"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
     
-    columns = ['inventory_id', 'batch_number', 'quantity', 'arrival_date', 'expiry_date',
-               'supplier_name', 'contact_info', 'status']
-    rows = cursor.fetchall()
-    conn.close()
+    # Read the batches and their unit total from one snapshot
+    conn.execute('BEGIN')
+    cursor.execute(_PRODUCT_BATCHES_SQL, (product_id,))
+    rows = [dict(row) for row in cursor]
+    
+    cursor.execute(_PRODUCT_BATCHES_UNITS_SQL, (product_id,))
+    total_quantity = cursor.fetchone()[0]
+    release_db_connection(conn)  # also ends the read transaction
     
-    return jsonify({
+    return json_response({
         'product_id': product_id,
         'total_batches': len(rows),
-        'total_quantity': sum(row[2] for row in rows),
-        'batches': [dict(zip(columns, row)) for row in rows]
+        'total_quantity': total_quantity,
+        'batches': rows
     })
 
 
-@app.route('/suppliers', methods=['GET'])
-def get_suppliers():
-    """Get all suppliers"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
+_SUPPLIERS_SQL = """
         SELECT 
             s.supplier_id,
             s.supplier_name,
@@ -799,22 +1095,42 @@ def get_suppliers():
         LEFT JOIN inventory i ON s.supplier_id = i.supplier_id
         GROUP BY s.supplier_id
         ORDER BY total_batches DESC
-    """)
+"""
+
+
+@app.route('/suppliers', methods=['GET'])
+def get_suppliers():
+    """Get all suppliers"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
     
-    columns = ['supplier_id', 'supplier_name', 'contact_info', 'total_batches', 'total_units_supplied']
-    rows = cursor.fetchall()
-    conn.close()
+    cursor.execute(_SUPPLIERS_SQL)
+    
+    rows = [dict(row) for row in cursor]
+    release_db_connection(conn)
     
-    return jsonify([dict(zip(columns, row)) for row in rows])
+    return json_response(rows)
 
 
 # ============================================================================
 # MACHINE LEARNING FORECASTING ENGINE
 # ============================================================================
 
+# Daily sales of one product over the 90 days before today
+_PRODUCT_HISTORY_SQL = """
+    SELECT DATE(s.SalesDate) as sale_date, SUM(s.Quantity) as total_qty
+    FROM sales s
+    WHERE s.ProductID = ?
+      AND s.SalesDate >= date('now', '-90 days')
+      AND s.SalesDate < date('now')
+    GROUP BY DATE(s.SalesDate)
+    ORDER BY sale_date
+"""
+
+
 def generate_ml_forecast(product_id, days=30):
     """
-    Generate demand forecast using Random Forest Regressor based on historical sales data.
+    Generate demand forecast using a regression model trained on historical sales data.
     Uses time-series features: day of week, day of month, week of year, lag features.
     
     Returns: list of forecast dictionaries with dates and predictions
@@ -824,160 +1140,193 @@ def generate_ml_forecast(product_id, days=30):
     
     try:
         # Get historical sales data (last 90 days)
-        cursor.execute("""
-            SELECT DATE(s.SalesDate) as sale_date, SUM(s.Quantity) as total_qty
-            FROM sales s
-            WHERE s.ProductID = ?
-              AND s.SalesDate >= date('now', '-90 days')
-              AND s.SalesDate < date('now')
-            GROUP BY DATE(s.SalesDate)
-            ORDER BY sale_date
-        """, (product_id,))
+        cursor.execute(_PRODUCT_HISTORY_SQL, (product_id,))
         
         history = cursor.fetchall()
-        
-        if len(history) < 14:
-            # Need at least 2 weeks for Random Forest
-            return None
-        
-        # Build feature matrix from historical data
-        X_train = []
-        y_train = []
-        
-        for i, (date_str, qty) in enumerate(history):
-            dt = datetime.strptime(date_str, '%Y-%m-%d')
-            
-            # Time-based features
-            day_of_week = dt.weekday()
-            day_of_month = dt.day
-            week_of_year = dt.isocalendar()[1]
-            month = dt.month
-            
-            # Lag features (previous days' sales)
-            lag_1 = history[i-1][1] if i >= 1 else qty
-            lag_7 = history[i-7][1] if i >= 7 else qty
-            
-            # Rolling average features
-            if i >= 7:
-                recent_avg = np.mean([history[j][1] for j in range(i-7, i)])
-            else:
-                recent_avg = qty
-            
-            features = [
-                day_of_week,
-                day_of_month,
-                week_of_year,
-                month,
-                lag_1,
-                lag_7,
-                recent_avg
-            ]
-            
-            X_train.append(features)
-            y_train.append(qty)
-        
-        # Train Random Forest model
-        rf_model = RandomForestRegressor(
-            n_estimators=100,
-            max_depth=10,
-            min_samples_split=2,
-            min_samples_leaf=1,
-            random_state=42,
-            n_jobs=-1
+    except Exception as e:
+        print(f"Error in ML forecast for product {product_id}: {e}")
+        return None
+    finally:
+        release_db_connection(conn)
+    
+    return _forecast_from_history(product_id, history, days)
+
+
+# Fewest days of sales history a product needs before a model is trained for it
+_MIN_HISTORY_DAYS = 14
+
+# Fitted forecast models keyed by (product_id, history), least recently used evicted first
+_MODEL_CACHE_SIZE = 256
+_model_cache = OrderedDict()
+_model_cache_lock = threading.Lock()
+
+# Summary forecasts are trained one product per worker; model fits run in compiled
+# code that releases the GIL, so threads are enough to use every core. Each worker pins
+# OpenMP (HistGradientBoostingRegressor's thread pool) to one thread to avoid cpu^2 threads.
+_forecast_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix='ml-forecast')
+
+
+def _calendar_features(dates):
+    """Day of week (Monday=0), day of month, ISO week and month for a datetime64[D] array."""
+    # 1970-01-01 was a Thursday; ISO weeks are counted from the week's Thursday
+    day_of_week = (dates.astype(np.int64) + 3) % 7
+    day_of_month = (dates - dates.astype('datetime64[M]')).astype(np.int64) + 1
+    month = dates.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    thursday = dates - day_of_week + 3
+    week_of_year = (thursday - thursday.astype('datetime64[Y]')).astype(np.int64) // 7 + 1
+    return day_of_week, day_of_month, week_of_year, month
+
+
+def _fit_forecast_model(history):
+    """
+    Train the demand model on daily history.
+    
+    Returns: (model, mean_demand, std_demand, day_factors)
+    """
+    # Build feature matrix from historical data (one vectorized pass)
+    dates = np.array([row[0] for row in history], dtype='datetime64[D]')
+    qty = np.array([row[1] for row in history], dtype=np.float64)
+    
+    # Time-based features
+    day_of_week, day_of_month, week_of_year, month = _calendar_features(dates)
+    
+    # Lag features (previous days' sales); the first days fall back to their own quantity
+    lag_1 = np.concatenate([qty[:1], qty[:-1]])
+    lag_7 = qty.copy()
+    lag_7[7:] = qty[:-7]
+    
+    # Rolling average of the 7 preceding days
+    recent_avg = qty.copy()
+    running = np.concatenate([[0.0], np.cumsum(qty)])
+    recent_avg[7:] = (running[7:-1] - running[:-8]) / 7
+    
+    X_train = np.column_stack([
+        day_of_week,
+        day_of_month,
+        week_of_year,
+        month,
+        lag_1,
+        lag_7,
+        recent_avg
+    ])
+    y_train = qty
+    
+    # Train the model: ridge regression for short histories, a small
+    # gradient-boosted ensemble once there are enough days to split on
+    if len(history) < 60:
+        model = Ridge(alpha=1.0)
+    else:
+        model = HistGradientBoostingRegressor(
+            max_iter=50,
+            max_depth=4,
+            learning_rate=0.1,
+            random_state=42
         )
+    
+    model.fit(X_train, y_train)
+    
+    # Calculate statistics for confidence and factors
+    mean_demand = np.mean(qty)
+    std_demand = np.std(qty)
+    
+    # Day-of-week seasonality (for season_factor reporting); weekdays without sales get 1.0
+    overall_avg = mean_demand if mean_demand > 0 else 1
+    day_sums = np.bincount(day_of_week, weights=qty, minlength=7)
+    day_counts = np.bincount(day_of_week, minlength=7)
+    day_avg = np.where(day_counts > 0, day_sums / np.maximum(day_counts, 1), overall_avg)
+    day_factors = dict(enumerate((day_avg / overall_avg).tolist()))
+    
+    return model, mean_demand, std_demand, day_factors
+
+
+def _forecast_from_history(product_id, history, days=30):
+    """
+    Run the ML forecast on preloaded daily history.
+    
+    `history` is a list of (sale_date, total_qty) rows ordered by date.
+    Returns: list of forecast dictionaries, or None if history is too short
+    """
+    try:
+        if len(history) < _MIN_HISTORY_DAYS:
+            # Need at least 2 weeks of history to train on
+            return None
         
-        rf_model.fit(X_train, y_train)
-        
-        # Calculate statistics for confidence and factors
+        # Reuse the fitted model while the product's sales history is unchanged
+        key = (product_id, tuple(tuple(row) for row in history))
+        with _model_cache_lock:
+            fitted = _model_cache.get(key)
+            if fitted is not None:
+                _model_cache.move_to_end(key)
+        if fitted is None:
+            fitted = _fit_forecast_model(history)
+            with _model_cache_lock:
+                _model_cache[key] = fitted
+                if len(_model_cache) > _MODEL_CACHE_SIZE:
+                    _model_cache.popitem(last=False)
+        model, mean_demand, std_demand, day_factors = fitted
         quantities = [float(row[1]) for row in history]
-        mean_demand = np.mean(quantities)
-        std_demand = np.std(quantities)
-        
-        # Day-of-week seasonality (for season_factor reporting)
-        day_quantities = defaultdict(list)
-        for date_str, qty in history:
-            dt = datetime.strptime(date_str, '%Y-%m-%d')
-            day_quantities[dt.weekday()].append(qty)
-        
-        day_factors = {}
-        overall_avg = mean_demand if mean_demand > 0 else 1
-        for day in range(7):
-            if day in day_quantities and len(day_quantities[day]) > 0:
-                day_avg = np.mean(day_quantities[day])
-                day_factors[day] = day_avg / overall_avg
-            else:
-                day_factors[day] = 1.0
         
-        # Generate forecasts
-        forecasts = []
+        # Generate forecasts in 7-day blocks, one predict call per block. lag_7
+        # always refers to an already known day; lag_1 and the rolling average
+        # are refreshed from the latest predictions at the start of each block.
         last_qty = quantities[-1]
         last_7_qty = quantities[-7] if len(quantities) >= 7 else last_qty
         last_7_avg = np.mean(quantities[-7:]) if len(quantities) >= 7 else mean_demand
         
-        for i in range(days):
-            forecast_date = datetime.now() + timedelta(days=i+1)
-            date_str = forecast_date.strftime('%Y-%m-%d')
-            
-            # Build features for prediction
-            day_of_week = forecast_date.weekday()
-            day_of_month = forecast_date.day
-            week_of_year = forecast_date.isocalendar()[1]
-            month = forecast_date.month
-            
-            # Use last known values for lag features
-            lag_1 = forecasts[-1]['predicted_demand'] if forecasts else last_qty
-            lag_7 = forecasts[-7]['predicted_demand'] if len(forecasts) >= 7 else last_7_qty
-            
-            # Rolling average
-            if len(forecasts) >= 7:
-                recent_avg = np.mean([f['predicted_demand'] for f in forecasts[-7:]])
-            else:
-                recent_avg = last_7_avg
+        forecast_dates = np.datetime64(datetime.now().date(), 'D') + np.arange(1, days + 1)
+        day_of_week, day_of_month, week_of_year, month = _calendar_features(forecast_dates)
+        predictions = []
+        
+        for start in range(0, days, 7):
+            stop = min(start + 7, days)
+            lag_1 = predictions[-1] if predictions else last_qty
+            lag_7 = [predictions[i - 7] if i >= 7 else last_7_qty for i in range(start, stop)]
+            recent_avg = np.mean(predictions[-7:]) if len(predictions) >= 7 else last_7_avg
             
-            features = [[
-                day_of_week,
-                day_of_month,
-                week_of_year,
-                month,
-                lag_1,
+            features = np.column_stack([
+                day_of_week[start:stop],
+                day_of_month[start:stop],
+                week_of_year[start:stop],
+                month[start:stop],
+                np.full(stop - start, lag_1),
                 lag_7,
-                recent_avg
-            ]]
+                np.full(stop - start, recent_avg)
+            ])
             
             # Predict
-            predicted_demand = max(0, rf_model.predict(features)[0])
-            
-            # Calculate factors for reporting
-            season_factor = day_factors.get(day_of_week, 1.0)
-            
-            # Market factor (momentum)
-            market_factor = last_7_avg / mean_demand if mean_demand > 0 else 1.0
-            market_factor = max(0.5, min(1.5, market_factor))
-            
-            # Confidence based on Random Forest's prediction variance and CV
-            cv = std_demand / mean_demand if mean_demand > 0 else 1.0
-            base_confidence = max(0.6, min(0.95, 1.0 - cv * 0.3))
-            
-            # Random Forest gives us implicit confidence through ensemble
-            confidence = base_confidence
-            
-            forecasts.append({
-                'forecast_date': date_str,
-                'predicted_demand': round(predicted_demand, 2),
-                'season_factor': round(season_factor, 3),
-                'market_factor': round(market_factor, 3),
-                'confidence_level': round(confidence, 3)
-            })
+            predictions.extend(round(max(0, p), 2) for p in model.predict(features))
+        
+        # Market factor (momentum)
+        market_factor = last_7_avg / mean_demand if mean_demand > 0 else 1.0
+        market_factor = max(0.5, min(1.5, market_factor))
+        
+        # Confidence based on the coefficient of variation (CV)
+        cv = std_demand / mean_demand if mean_demand > 0 else 1.0
+        confidence = max(0.6, min(0.95, 1.0 - cv * 0.3))
+        
+        forecasts = [{
+            'forecast_date': date_str,
+            'predicted_demand': predicted_demand,
+            'season_factor': round(day_factors.get(day, 1.0), 3),
+            'market_factor': round(market_factor, 3),
+            'confidence_level': round(confidence, 3)
+        } for date_str, day, predicted_demand in zip(
+            forecast_dates.astype(str).tolist(), day_of_week.tolist(), predictions
+        )]
         
         return forecasts
         
     except Exception as e:
-        print(f"Error in Random Forest forecast for product {product_id}: {e}")
+        print(f"Error in ML forecast for product {product_id}: {e}")
         import traceback
         traceback.print_exc()
         return None
-    finally:
-        conn.close()
+
+
+def _summary_forecast(product_id, history):
+    """Forecast one summary product on a worker thread with OpenMP limited to that thread."""
+    with threadpool_limits(1, user_api='openmp'):
+        return _forecast_from_history(product_id, history, days=30)
 
 
 def generate_ml_summary():
@@ -989,23 +1338,45 @@ def generate_ml_summary():
     cursor = conn.cursor()
     
     try:
-        # Get products with recent sales
+        # Only the best sellers that have enough history to train on are modelled
         cursor.execute("""
-            SELECT DISTINCT p.ProductID, p.ProductName, c.CategoryName
+            SELECT p.ProductID, p.ProductName, c.CategoryName
             FROM products p
             JOIN categories c ON p.CategoryID = c.CategoryID
             JOIN sales s ON p.ProductID = s.ProductID
             WHERE s.SalesDate >= date('now', '-90 days')
-            ORDER BY p.ProductID
-            LIMIT 100
-        """)
+              AND s.SalesDate < date('now')
+            GROUP BY p.ProductID
+            HAVING COUNT(DISTINCT DATE(s.SalesDate)) >= ?
+            ORDER BY SUM(s.Quantity) DESC, p.ProductID
+            LIMIT 50
+        """, (_MIN_HISTORY_DAYS,))
         
         products = cursor.fetchall()
+        
+        # Load the daily history of every candidate in one query
+        cursor.execute(f"""
+            SELECT s.ProductID, DATE(s.SalesDate) as sale_date, SUM(s.Quantity) as total_qty
+            FROM sales s
+            WHERE s.ProductID IN ({','.join('?' * len(products))})
+              AND s.SalesDate >= date('now', '-90 days')
+              AND s.SalesDate < date('now')
+            GROUP BY s.ProductID, DATE(s.SalesDate)
+            ORDER BY s.ProductID, sale_date
+        """, [row[0] for row in products])
+        
+        histories = defaultdict(list)
+        for product_id, sale_date, total_qty in cursor:
+            histories[product_id].append((sale_date, total_qty))
+        
+        all_forecasts = _forecast_executor.map(
+            lambda product_id: _summary_forecast(product_id, histories[product_id]),
+            [row[0] for row in products]
+        )
+        
         summaries = []
         
-        for product_id, product_name, category_name in products:
-            forecasts = generate_ml_forecast(product_id, days=30)
-            
+        for (product_id, product_name, category_name), forecasts in zip(products, all_forecasts):
             if forecasts and len(forecasts) > 0:
                 avg_daily = np.mean([f['predicted_demand'] for f in forecasts])
                 total_30day = sum([f['predicted_demand'] for f in forecasts])
@@ -1027,7 +1398,7 @@ def generate_ml_summary():
         print(f"Error generating ML summary: {e}")
         return []
     finally:
-        conn.close()
+        release_db_connection(conn)
 
 
 # ============================================================================
@@ -1040,16 +1411,25 @@ def get_product_forecast(product_id):
     days = request.args.get('days', 30, type=int)
     days = min(90, max(1, days))  # clamp to 1-90 days
     
-    # Try ML forecast first
-    forecasts = generate_ml_forecast(product_id, days)
-    
-    if forecasts:
-        return jsonify({
-            'product_id': product_id,
-            'forecast_days': days,
-            'forecasts': forecasts,
-            'source': 'ml'
-        })
+    # ML forecasts only look at sales before today, so the serialized response is
+    # reused until the day changes (SQLite's UTC day or the local day the dates start from)
+    cache_key = f'ml-forecast/{product_id}/{days}/{datetime.utcnow():%Y-%m-%d}/{datetime.now():%Y-%m-%d}'
+    body = cache.get(cache_key)
+    
+    if body is None:
+        # Try ML forecast first
+        forecasts = generate_ml_forecast(product_id, days)
+        if forecasts:
+            body = orjson.dumps({
+                'product_id': product_id,
+                'forecast_days': days,
+                'forecasts': forecasts,
+                'source': 'ml'
+            }, option=_ORJSON_OPTIONS)
+            cache.set(cache_key, body, timeout=24 * 60 * 60)
+    
+    if body is not None:
+        return Response(body, mimetype='application/json')
     
     # Fallback to database if ML fails (not enough data)
     conn = get_db_connection()
@@ -1068,14 +1448,13 @@ def get_product_forecast(product_id):
         ORDER BY forecast_date ASC
     """, (product_id, days))
     
-    columns = ['forecast_date', 'predicted_demand', 'season_factor', 'market_factor', 'confidence_level']
-    rows = cursor.fetchall()
-    conn.close()
+    rows = [dict(row) for row in cursor]
+    release_db_connection(conn)
     
-    return jsonify({
+    return json_response({
         'product_id': product_id,
         'forecast_days': days,
-        'forecasts': [dict(zip(columns, row)) for row in rows],
+        'forecasts': rows,
         'source': 'database'
     })
 
@@ -1088,7 +1467,7 @@ def get_forecast_summary():
     ml_summary = generate_ml_summary()
     
     if ml_summary and len(ml_summary) > 0:
-        return jsonify(ml_summary)
+        return json_response(ml_summary)
     
     # Fallback to database
     conn = get_db_connection()
@@ -1096,8 +1475,8 @@ def get_forecast_summary():
     
     cursor.execute("""
         SELECT 
-            p.ProductName,
-            c.CategoryName,
+            p.ProductName as product_name,
+            c.CategoryName as category,
             AVG(f.predicted_demand) as avg_daily_demand,
             SUM(f.predicted_demand) as total_30day_demand,
             AVG(f.confidence_level) as avg_confidence
@@ -1110,48 +1489,36 @@ def get_forecast_summary():
         LIMIT 50
     """)
     
-    columns = ['product_name', 'category', 'avg_daily_demand', 'total_30day_demand', 'avg_confidence']
     rows = cursor.fetchall()
-    conn.close()
+    release_db_connection(conn)
     
-    return jsonify([dict(zip(columns, row)) for row in rows])
+    return json_response(rows)
 
 
 # ============================================================================
 # PROCUREMENT RECOMMENDATIONS APIs
 # ============================================================================
 
-@app.route('/procurement/recommendations', methods=['GET'])
-def get_procurement_recommendations():
-    """Get all procurement recommendations"""
-    priority = request.args.get('priority', None)
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    query = """
+_RECOMMENDATIONS_SELECT = """
         SELECT 
             pr.recommendation_id,
-            p.ProductName,
-            c.CategoryName,
+            p.ProductName as product_name,
+            c.CategoryName as category,
             pr.recommended_quantity,
             pr.reason,
             pr.priority,
             pr.status,
             pr.created_date,
-            COALESCE(SUM(i.quantity), 0) as current_stock
+            (SELECT COALESCE(SUM(i.quantity), 0)
+             FROM inventory i
+             WHERE i.product_id = pr.product_id) as current_stock
         FROM procurement_recommendations pr
         JOIN products p ON pr.product_id = p.ProductID
         JOIN categories c ON p.CategoryID = c.CategoryID
-        LEFT JOIN inventory i ON p.ProductID = i.product_id
         WHERE pr.status = 'PENDING'
-    """
-    
-    if priority:
-        query += f" AND pr.priority = '{priority.upper()}'"
-    
-    query += """
-        GROUP BY pr.recommendation_id
+"""
+
+_RECOMMENDATIONS_ORDER = """
         ORDER BY 
             CASE pr.priority 
                 WHEN 'HIGH' THEN 1 
@@ -1159,19 +1526,35 @@ def get_procurement_recommendations():
                 WHEN 'LOW' THEN 3 
             END,
             pr.created_date DESC
-    """
+"""
+
+# Fixed statement texts (priority is a bound parameter) so SQLite's statement cache reuses them
+_PENDING_RECOMMENDATIONS_SQL = _RECOMMENDATIONS_SELECT + _RECOMMENDATIONS_ORDER
+_PENDING_RECOMMENDATIONS_BY_PRIORITY_SQL = (
+    _RECOMMENDATIONS_SELECT + "          AND pr.priority = ?\n" + _RECOMMENDATIONS_ORDER
+)
+
+
+@app.route('/procurement/recommendations', methods=['GET'])
+def get_procurement_recommendations():
+    """Get all procurement recommendations"""
+    priority = request.args.get('priority', None)
     
-    cursor.execute(query)
+    conn = get_db_connection()
+    cursor = conn.cursor()
     
-    columns = ['recommendation_id', 'product_name', 'category', 'recommended_quantity',
-               'reason', 'priority', 'status', 'created_date', 'current_stock']
-    rows = cursor.fetchall()
-    conn.close()
+    if priority:
+        cursor.execute(_PENDING_RECOMMENDATIONS_BY_PRIORITY_SQL, (priority.upper(),))
+    else:
+        cursor.execute(_PENDING_RECOMMENDATIONS_SQL)
+    
+    rows = [dict(row) for row in cursor]
+    release_db_connection(conn)
     
-    return jsonify({
+    return json_response({
         'total_recommendations': len(rows),
         'filter_priority': priority,
-        'recommendations': [dict(zip(columns, row)) for row in rows]
+        'recommendations': rows
     })
 
 
@@ -1195,9 +1578,9 @@ def get_procurement_stats():
     cursor.execute("SELECT COUNT(*) FROM procurement_recommendations WHERE status = 'PENDING'")
     total = cursor.fetchone()[0]
     
-    conn.close()
+    release_db_connection(conn)
     
-    return jsonify({
+    return json_response({
         'total_pending': total,
         'priority_breakdown': priority_stats
     })
@@ -1207,25 +1590,6 @@ def get_procurement_stats():
 # PROCUREMENT CART/APPROVAL APIs
 # ============================================================================
 
-def _ensure_po_tables(cursor):
-    """Create purchase order tables if missing (idempotent)."""
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS purchase_orders (
-            po_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            status TEXT NOT NULL DEFAULT 'DRAFT',
-            created_date TEXT NOT NULL DEFAULT (datetime('now'))
-        )
-    ''')
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS purchase_order_items (
-            poi_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            po_id INTEGER NOT NULL,
-            product_id INTEGER NOT NULL,
-            quantity INTEGER NOT NULL,
-            FOREIGN KEY (po_id) REFERENCES purchase_orders(po_id)
-        )
-    ''')
-
 def _get_or_create_draft_po(cursor):
     cursor.execute("SELECT po_id FROM purchase_orders WHERE status='DRAFT' ORDER BY po_id DESC LIMIT 1")
     row = cursor.fetchone()
@@ -1241,8 +1605,6 @@ def approve_recommendation(rec_id):
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
-        _ensure_po_tables(cursor)
-
         # Fetch recommendation
         cursor.execute('''
             SELECT recommendation_id, product_id, recommended_quantity, status
@@ -1251,15 +1613,12 @@ def approve_recommendation(rec_id):
         ''', (rec_id,))
         rec = cursor.fetchone()
         if not rec:
-            return jsonify({'error': 'Recommendation not found'}), 404
+            return json_response({'error': 'Recommendation not found'}), 404
 
         _, product_id, qty, status = rec
 
         # Optional quantity override from request body
-        try:
-            body = request.get_json(silent=True) or {}
-        except Exception:
-            body = {}
+        body = read_json_body()
         override_qty = body.get('quantity') if isinstance(body, dict) else None
         if override_qty is not None:
             try:
@@ -1281,17 +1640,11 @@ def approve_recommendation(rec_id):
         # Add to cart if there is a quantity to order (>0)
         if add_qty and add_qty > 0:
             po_id = _get_or_create_draft_po(cursor)
-            # If item already in cart, increase quantity
+            # Add the line, or increase its quantity if the product is already in the cart
             cursor.execute('''
-                SELECT poi_id, quantity FROM purchase_order_items 
-                WHERE po_id=? AND product_id=?
-            ''', (po_id, product_id))
-            existing = cursor.fetchone()
-            if existing:
-                poi_id, existing_qty = existing
-                cursor.execute('UPDATE purchase_order_items SET quantity=? WHERE poi_id=?', (existing_qty + add_qty, poi_id))
-            else:
-                cursor.execute('INSERT INTO purchase_order_items(po_id, product_id, quantity) VALUES(?, ?, ?)', (po_id, product_id, add_qty))
+                INSERT INTO purchase_order_items(po_id, product_id, quantity) VALUES(?, ?, ?)
+                ON CONFLICT(po_id, product_id) DO UPDATE SET quantity = quantity + excluded.quantity
+            ''', (po_id, product_id, add_qty))
 
         # Return updated cart summary
         cursor.execute("""
@@ -1307,9 +1660,9 @@ def approve_recommendation(rec_id):
         conn.commit()
 
         if not cart:
-            return jsonify({'cart': None, 'message': 'Approved'}), 200
+            return json_response({'cart': None, 'message': 'Approved'}), 200
 
-        return jsonify({
+        return json_response({
             'cart': {
                 'po_id': cart[0],
                 'status': cart[1],
@@ -1320,9 +1673,9 @@ def approve_recommendation(rec_id):
         })
     except Exception as e:
         conn.rollback()
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
     finally:
-        conn.close()
+        release_db_connection(conn)
 
 
 @app.route('/procurement/cart', methods=['GET'])
@@ -1331,11 +1684,10 @@ def get_cart():
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
-        _ensure_po_tables(cursor)
         cursor.execute("SELECT po_id FROM purchase_orders WHERE status='DRAFT' ORDER BY po_id DESC LIMIT 1")
         row = cursor.fetchone()
         if not row:
-            return jsonify({'cart': None})
+            return json_response({'cart': None})
         po_id = row[0]
         cursor.execute('''
             SELECT poi.poi_id, poi.product_id, p.ProductName, poi.quantity
@@ -1345,11 +1697,11 @@ def get_cart():
             ORDER BY poi.poi_id
         ''', (po_id,))
         items = [{'item_id': r[0], 'product_id': r[1], 'product_name': r[2], 'quantity': r[3]} for r in cursor.fetchall()]
-        return jsonify({'cart': {'po_id': po_id, 'status': 'DRAFT', 'items': items, 'total_items': len(items), 'total_units': sum(i['quantity'] for i in items)}})
+        return json_response({'cart': {'po_id': po_id, 'status': 'DRAFT', 'items': items, 'total_items': len(items), 'total_units': sum(i['quantity'] for i in items)}})
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
     finally:
-        conn.close()
+        release_db_connection(conn)
 
 
 @app.route('/procurement/cart/checkout', methods=['POST'])
@@ -1358,38 +1710,103 @@ def checkout_cart():
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
-        _ensure_po_tables(cursor)
+        # Lookup and both updates run in one write transaction, so two concurrent
+        # checkouts cannot submit the same draft
+        conn.execute('BEGIN IMMEDIATE')
         cursor.execute("SELECT po_id FROM purchase_orders WHERE status='DRAFT' ORDER BY po_id DESC LIMIT 1")
         row = cursor.fetchone()
         if not row:
-            return jsonify({'message': 'Cart empty'}), 200
+            return json_response({'message': 'Cart empty'}), 200
         po_id = row[0]
 
         # Submit PO
         cursor.execute("UPDATE purchase_orders SET status='SUBMITTED' WHERE po_id=?", (po_id,))
 
-        # Optionally mark recommendations as ORDERED for product_ids present in the cart
-        cursor.execute('SELECT DISTINCT product_id FROM purchase_order_items WHERE po_id=?', (po_id,))
-        product_ids = [r[0] for r in cursor.fetchall()]
-        if product_ids:
-            cursor.execute(
-                f"UPDATE procurement_recommendations SET status='ORDERED' WHERE status IN ('PENDING','APPROVED') AND product_id IN ({','.join(['?']*len(product_ids))})",
-                product_ids
-            )
+        # Mark recommendations as ORDERED for products present in the cart
+        cursor.execute('''
+            UPDATE procurement_recommendations SET status='ORDERED'
+            WHERE status IN ('PENDING','APPROVED')
+              AND product_id IN (SELECT product_id FROM purchase_order_items WHERE po_id=?)
+        ''', (po_id,))
 
         conn.commit()
-        return jsonify({'message': 'Purchase Order submitted', 'po_id': po_id})
+        return json_response({'message': 'Purchase Order submitted', 'po_id': po_id})
     except Exception as e:
         conn.rollback()
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
     finally:
-        conn.close()
+        release_db_connection(conn)
 
 
 # ============================================================================
 # CUSTOMER CART CHECKOUT API
 # ============================================================================
 
+# Checkout statements. The customer and product lookups share one row shape so they can
+# run as a single UNION ALL; the IN list gets one placeholder per product to look up.
+_CHECKOUT_CUSTOMER_SQL = "SELECT 'customer', CustomerID, NULL, NULL FROM customers WHERE CustomerID = ?"
+_CHECKOUT_PRODUCTS_SQL = "SELECT 'product', ProductID, Price, ProductName FROM products WHERE ProductID IN ({})"
+_INSERT_SALE_SQL = """
+    INSERT INTO sales (SalesDate, ProductID, Quantity, SalesPersonID, CustomerID)
+    VALUES (?, ?, ?, NULL, ?)
+"""
+
+# (Price, ProductName) by ProductID for checkout pricing, least recently used evicted
+# first. Nothing in this server edits products; clear it after any product write.
+_PRODUCT_CACHE_SIZE = 4096
+_product_cache = OrderedDict()
+_product_cache_lock = threading.Lock()
+
+
+def _cached_products(pids):
+    """Split product ids into ({ProductID: (price, name)} already cached, [ids to look up])."""
+    found = {}
+    with _product_cache_lock:
+        for pid in pids:
+            prod = _product_cache.get(pid)
+            if prod is not None:
+                _product_cache.move_to_end(pid)
+                found[pid] = prod
+    return found, [pid for pid in pids if pid not in found]
+
+
+def _cache_products(fetched):
+    """Remember freshly read {ProductID: (price, name)} pairs (unknown ids are never cached)."""
+    with _product_cache_lock:
+        _product_cache.update(fetched)
+        while len(_product_cache) > _PRODUCT_CACHE_SIZE:
+            _product_cache.popitem(last=False)
+
+
+# Customer ids confirmed to exist, mapped to the monotonic time their entry expires.
+# Every entry lives _CUSTOMER_CACHE_TTL seconds, so insertion order is expiry order.
+_CUSTOMER_CACHE_SIZE = 10000
+_CUSTOMER_CACHE_TTL = 5 * 60
+_known_customers = OrderedDict()
+_known_customers_lock = threading.Lock()
+
+
+def _customer_known(customer_id):
+    """Return True if the customer was confirmed to exist within the last few minutes."""
+    with _known_customers_lock:
+        expires = _known_customers.get(customer_id)
+        if expires is None:
+            return False
+        if expires <= time.monotonic():
+            del _known_customers[customer_id]
+            return False
+        return True
+
+
+def _remember_customer(customer_id):
+    """Record that a customer exists, dropping expired and overflowing entries."""
+    now = time.monotonic()
+    with _known_customers_lock:
+        _known_customers.pop(customer_id, None)
+        _known_customers[customer_id] = now + _CUSTOMER_CACHE_TTL
+        while len(_known_customers) > _CUSTOMER_CACHE_SIZE or next(iter(_known_customers.values())) <= now:
+            _known_customers.popitem(last=False)
+
 @app.route('/customer/checkout', methods=['POST'])
 def customer_checkout():
     """Record cart items as sales for a given customer.
@@ -1399,178 +1816,245 @@ def customer_checkout():
       "customer_id": <int>,
       "items": [{"product_id": <int>, "quantity": <int>}, ...]
     }
+
+    With ?stream=1 a successful checkout is answered as NDJSON: one object per
+    cart line, then the summary object (errors are still plain JSON).
     """
-    data = request.get_json(silent=True) or {}
+    # A malformed or non-object body is treated as empty, as get_json(silent=True) was
+    data = read_json_body()
+    if not isinstance(data, dict):
+        data = {}
     customer_id = data.get('customer_id')
     items = data.get('items') or []
 
     if not isinstance(customer_id, int) or customer_id <= 0:
-        return jsonify({'error': 'Invalid or missing customer_id'}), 400
+        return json_response({'error': 'Invalid or missing customer_id'}), 400
     if not isinstance(items, list) or not items:
-        return jsonify({'error': 'No items to checkout'}), 400
+        return json_response({'error': 'No items to checkout'}), 400
 
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
-        # Validate customer exists
-        cursor.execute('SELECT 1 FROM customers WHERE CustomerID=?', (customer_id,))
-        if not cursor.fetchone():
-            return jsonify({'error': 'Customer not found'}), 404
-
-        # Insert each cart line as a sale
-        total_amount = 0.0
-        total_qty = 0
-        lines = []
+        # Validate every cart line before touching the database
+        parsed = []
         for line in items:
             try:
                 pid = int(line.get('product_id'))
                 qty = int(line.get('quantity'))
             except Exception:
-                return jsonify({'error': 'Invalid item format'}), 400
+                return json_response({'error': 'Invalid item format'}), 400
             if pid <= 0 or qty <= 0:
-                return jsonify({'error': 'Invalid product or quantity'}), 400
-
-            # Get price to compute amount
-            cursor.execute('SELECT Price, ProductName FROM products WHERE ProductID=?', (pid,))
-            prod = cursor.fetchone()
-            if not prod:
-                return jsonify({'error': f'Product not found: {pid}'}), 404
-            price, pname = prod[0], prod[1]
-
-            cursor.execute(
-                """
-                INSERT INTO sales (SalesDate, ProductID, Quantity, SalesPersonID, CustomerID)
-                VALUES (datetime('now'), ?, ?, NULL, ?)
-                """,
-                (pid, qty, customer_id)
-            )
-            line_amount = float(price) * qty
-            total_amount += line_amount
-            total_qty += qty
-            lines.append({'product_id': pid, 'product_name': pname, 'quantity': qty, 'unit_price': float(price), 'line_total': line_amount})
+                return json_response({'error': 'Invalid product or quantity'}), 400
+            parsed.append((pid, qty))
+
+        # The lookups and all line inserts share one write transaction (a single commit
+        # for the cart); an early return is rolled back by release_db_connection
+        conn.execute('BEGIN IMMEDIATE')
+        
+        # Customers found in the DB are remembered for 5 minutes and product prices are
+        # cached; whatever is not known yet is read in a single round trip
+        check_customer = not _customer_known(customer_id)
+        prod_map, missing = _cached_products(list({pid for pid, _ in parsed}))
+        if check_customer or missing:
+            parts, params = [], []
+            if check_customer:
+                parts.append(_CHECKOUT_CUSTOMER_SQL)
+                params.append(customer_id)
+            if missing:
+                parts.append(_CHECKOUT_PRODUCTS_SQL.format(','.join('?' * len(missing))))
+                params.extend(missing)
+            cursor.execute(' UNION ALL '.join(parts), params)
+            
+            customer_found = False
+            fetched = {}
+            for kind, row_id, price, name in cursor:
+                if kind == 'customer':
+                    customer_found = True
+                else:
+                    fetched[row_id] = (price, name)
+            _cache_products(fetched)
+            prod_map.update(fetched)
+            
+            if check_customer:
+                if not customer_found:
+                    return json_response({'error': 'Customer not found'}), 404
+                _remember_customer(customer_id)
+
+        # Every product must exist before anything is priced
+        for pid, _ in parsed:
+            if pid not in prod_map:
+                return json_response({'error': f'Product not found: {pid}'}), 404
+
+        # Price all lines at once in integer cents (unit prices rounded to the cent); the
+        # sales are inserted only after every line passed
+        pids, qtys = zip(*parsed)
+        prices = np.fromiter((prod_map[pid][0] for pid in pids), dtype=np.float64, count=len(pids))
+        price_cents = np.rint(prices * 100).astype(np.int64)
+        quantities = np.array(qtys, dtype=np.int64)
+        line_cents = price_cents * quantities
+        total_amount = int(line_cents.sum()) / 100
+        total_qty = int(quantities.sum())
+        lines = (
+            {'product_id': pid, 'product_name': prod_map[pid][1], 'quantity': qty, 'unit_price': unit / 100, 'line_total': line / 100}
+            for pid, qty, unit, line in zip(pids, qtys, price_cents.tolist(), line_cents.tolist())
+        )
+
+        # One UTC timestamp for the whole cart, in the same format as SQLite's datetime('now')
+        sale_ts = datetime.utcnow().isoformat(sep=' ', timespec='seconds')
+        sale_rows = [(sale_ts, pid, qty, customer_id) for pid, qty in parsed]
 
+        # Insert every cart line as a sale with one prepared statement
+        cursor.executemany(_INSERT_SALE_SQL, sale_rows)
         conn.commit()
-        return jsonify({'message': 'Checkout successful', 'customer_id': customer_id, 'total_quantity': total_qty, 'total_amount': total_amount, 'lines': lines})
+        summary = {'message': 'Checkout successful', 'customer_id': customer_id, 'total_quantity': total_qty, 'total_amount': total_amount}
+        
+        if request.args.get('stream') == '1':
+            def generate():
+                for line in lines:
+                    yield orjson.dumps(line) + b'\n'
+                yield orjson.dumps(summary) + b'\n'
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+        return json_response({**summary, 'lines': list(lines)})
     except Exception as e:
         conn.rollback()
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
     finally:
-        conn.close()
+        release_db_connection(conn)
+
+
+# Static response bodies, serialized once at import
+_HEALTH_BODY = orjson.dumps({
+    'status': 'Shelfware API Server is running',
+    'endpoints': {
+        'admin_login': '/admin-login',
+        'customer_login': '/customer-login', 
+        'customer_signup': '/customer-signup',
+        'check_username': '/check-username',
+        'products': '/products',
+        'categories': '/categories',
+        'product_details': '/product/<id>',
+        'inventory_stock': '/inventory/stock-levels',
+        'inventory_expiring': '/inventory/expiring-soon',
+        'suppliers': '/suppliers',
+        'forecasts': '/forecasts/product/<id>',
+        'procurement': '/procurement/recommendations'
+    }
+})
 
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
-    return jsonify({
-        'status': 'Shelfware API Server is running',
-        'endpoints': {
-            'admin_login': '/admin-login',
-            'customer_login': '/customer-login', 
-            'customer_signup': '/customer-signup',
-            'check_username': '/check-username',
-            'products': '/products',
-            'categories': '/categories',
-            'product_details': '/product/<id>',
-            'inventory_stock': '/inventory/stock-levels',
-            'inventory_expiring': '/inventory/expiring-soon',
-            'suppliers': '/suppliers',
-            'forecasts': '/forecasts/product/<id>',
-            'procurement': '/procurement/recommendations'
-        }
-    })
+    """Health check endpoint (never cached, so probes always reach the server)"""
+    return Response(_HEALTH_BODY, mimetype='application/json')
+
+
+_HOME_BODY = orjson.dumps({
+    'message': 'Shelfware - Shelf-Aware Grocery Inventory System',
+    'version': '2.0',
+    'description': 'Sales-Driven Forecasting & Market-Aligned Procurement',
+    'endpoints': {
+        'authentication': [
+            'POST /admin-login - Admin authentication',
+            'POST /customer-login - Customer authentication',
+            'POST /customer-signup - Customer registration',
+            'POST /check-username - Username availability'
+        ],
+        'products': [
+            'GET /products - Get products with filtering/pagination',
+            'GET /categories - Get all categories',
+            'GET /cities - Get all cities',
+            'GET /product/<id> - Get product details'
+        ],
+        'inventory': [
+            'GET /inventory/stock-levels - Current stock for all products',
+            'GET /inventory/expiring-soon?days=7 - Stock expiring soon',
+            'GET /inventory/expired - Already expired stock',
+            'GET /inventory/product/<id> - Inventory batches for product',
+            'GET /suppliers - All suppliers with stats'
+        ],
+        'forecasting': [
+            'GET /forecasts/product/<id>?days=30 - Demand forecast for product',
+            'GET /forecasts/summary - Top 50 products by predicted demand'
+        ],
+        'procurement': [
+            'GET /procurement/recommendations?priority=HIGH - Procurement recommendations',
+            'GET /procurement/stats - Procurement statistics'
+        ],
+        'customer': [
+            'POST /customer/checkout - Submit a customer cart as sales'
+        ],
+        'admin': [
+            'GET /admin/dashboard-stats - Dashboard KPIs',
+            'GET /admin/recent-sales - Recent sales transactions',
+            'GET /admin/products - Admin product management'
+        ],
+        'system': [
+            'GET /health - Health check',
+            'GET / - API documentation'
+        ]
+    }
+})
+
 
 @app.route('/', methods=['GET'])
 def home():
     """Home endpoint with API information"""
-    return jsonify({
-        'message': 'Shelfware - Shelf-Aware Grocery Inventory System',
-        'version': '2.0',
-        'description': 'Sales-Driven Forecasting & Market-Aligned Procurement',
-        'endpoints': {
-            'authentication': [
-                'POST /admin-login - Admin authentication',
-                'POST /customer-login - Customer authentication',
-                'POST /customer-signup - Customer registration',
-                'POST /check-username - Username availability'
-            ],
-            'products': [
-                'GET /products - Get products with filtering/pagination',
-                'GET /categories - Get all categories',
-                'GET /cities - Get all cities',
-                'GET /product/<id> - Get product details'
-            ],
-            'inventory': [
-                'GET /inventory/stock-levels - Current stock for all products',
-                'GET /inventory/expiring-soon?days=7 - Stock expiring soon',
-                'GET /inventory/expired - Already expired stock',
-                'GET /inventory/product/<id> - Inventory batches for product',
-                'GET /suppliers - All suppliers with stats'
-            ],
-            'forecasting': [
-                'GET /forecasts/product/<id>?days=30 - Demand forecast for product',
-                'GET /forecasts/summary - Top 50 products by predicted demand'
-            ],
-            'procurement': [
-                'GET /procurement/recommendations?priority=HIGH - Procurement recommendations',
-                'GET /procurement/stats - Procurement statistics'
-            ],
-            'customer': [
-                'POST /customer/checkout - Submit a customer cart as sales'
-            ],
-            'admin': [
-                'GET /admin/dashboard-stats - Dashboard KPIs',
-                'GET /admin/recent-sales - Recent sales transactions',
-                'GET /admin/products - Admin product management'
-            ],
-            'system': [
-                'GET /health - Health check',
-                'GET / - API documentation'
-            ]
-        }
-    })
+    return Response(_HOME_BODY, mimetype='application/json',
+                    headers={'Cache-Control': 'public, max-age=60'})
 
 # ============================================================================
 # MAIN APPLICATION
 # ============================================================================
 
 if __name__ == '__main__':
-    print("=" * 70)
-    print("Starting Shelfware - Shelf-Aware Grocery Inventory System")
-    print("=" * 70)
-    print("\nAvailable API endpoints:")
-    print("\nAuthentication:")
-    print("   - POST /admin-login - Admin authentication")
-    print("   - POST /customer-login - Customer authentication")
-    print("   - POST /customer-signup - Customer registration")
-    print("   - POST /check-username - Username availability")
-    print("\nProducts & Categories:")
-    print("   - GET /products - Get products with filtering/pagination")
-    print("   - GET /categories - Get all categories")
-    print("   - GET /cities - Get all cities")
-    print("   - GET /product/<id> - Get product details")
-    print("\nInventory Management:")
-    print("   - GET /inventory/stock-levels - Current stock for all products")
-    print("   - GET /inventory/expiring-soon?days=7 - Stock expiring soon")
-    print("   - GET /inventory/expired - Already expired stock")
-    print("   - GET /inventory/product/<id> - Inventory batches for product")
-    print("   - GET /suppliers - All suppliers with statistics")
-    print("\nDemand Forecasting:")
-    print("   - GET /forecasts/product/<id>?days=30 - Demand forecast for product")
-    print("   - GET /forecasts/summary - Top 50 products by predicted demand")
-    print("\nSmart Procurement:")
-    print("   - GET /procurement/recommendations?priority=HIGH - Get recommendations")
-    print("   - GET /procurement/stats - Procurement statistics")
-    print("\nCustomer:")
-    print("   - POST /customer/checkout - Submit a customer cart as sales")
-    print("\nAdmin Dashboard:")
-    print("   - GET /admin/dashboard-stats - Dashboard KPIs")
-    print("   - GET /admin/recent-sales - Recent sales transactions")
-    print("   - GET /admin/products - Admin product management")
-    print("\nSystem:")
-    print("   - GET /health - Health check")
-    print("   - GET / - API documentation")
-    print("=" * 70)
-    print("Server running on http://127.0.0.1:5000")
-    print("=" * 70 + "\n")
-    
-    app.run(port=5000, debug=True, host='127.0.0.1')
\ No newline at end of file
+    # Printed in one write; the debug reloader's child process (WERKZEUG_RUN_MAIN=true) skips it
+    if os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+        sys.stdout.write('\n'.join([
+            "=" * 70,
+            "Starting Shelfware - Shelf-Aware Grocery Inventory System",
+            "=" * 70,
+            "\nAvailable API endpoints:",
+            "\nAuthentication:",
+            "   - POST /admin-login - Admin authentication",
+            "   - POST /customer-login - Customer authentication",
+            "   - POST /customer-signup - Customer registration",
+            "   - POST /check-username - Username availability",
+            "\nProducts & Categories:",
+            "   - GET /products - Get products with filtering/pagination",
+            "   - GET /categories - Get all categories",
+            "   - GET /cities - Get all cities",
+            "   - GET /product/<id> - Get product details",
+            "\nInventory Management:",
+            "   - GET /inventory/stock-levels - Current stock for all products",
+            "   - GET /inventory/expiring-soon?days=7 - Stock expiring soon",
+            "   - GET /inventory/expired - Already expired stock",
+            "   - GET /inventory/product/<id> - Inventory batches for product",
+            "   - GET /suppliers - All suppliers with statistics",
+            "\nDemand Forecasting:",
+            "   - GET /forecasts/product/<id>?days=30 - Demand forecast for product",
+            "   - GET /forecasts/summary - Top 50 products by predicted demand",
+            "\nSmart Procurement:",
+            "   - GET /procurement/recommendations?priority=HIGH - Get recommendations",
+            "   - GET /procurement/stats - Procurement statistics",
+            "\nCustomer:",
+            "   - POST /customer/checkout - Submit a customer cart as sales",
+            "\nAdmin Dashboard:",
+            "   - GET /admin/dashboard-stats - Dashboard KPIs",
+            "   - GET /admin/recent-sales - Recent sales transactions",
+            "   - GET /admin/products - Admin product management",
+            "\nSystem:",
+            "   - GET /health - Health check",
+            "   - GET / - API documentation",
+            "=" * 70,
+            "Server running on http://127.0.0.1:5000",
+            "=" * 70 + "\n"
+        ]) + '\n')
+    
+    # SHELFWARE_DEBUG=1 runs the Flask debug server (reloader + debugger) instead
+    if os.environ.get('SHELFWARE_DEBUG') == '1':
+        app.run(port=5000, debug=True, host='127.0.0.1')
+    else:
+        from waitress import serve
+        serve(app, host='127.0.0.1', port=5000, threads=_DB_POOL_SIZE)
\ No newline at end of file
@@ -1,19 +1,31 @@
 import sqlite3
 import os
+from contextlib import closing
 
 here = os.path.abspath(os.path.dirname(__file__))
 db_path = os.path.join(here, 'employees.db')
 
-con = sqlite3.connect(db_path)
-cur = con.cursor()
-cur.execute("SELECT COUNT(*) FROM inventory WHERE expiry_date IS NULL")
-nulls = cur.fetchone()[0]
-print('NULL expiry remaining:', nulls)
+with closing(sqlite3.connect(db_path)) as con:
+    cur = con.cursor()
 
-cur.execute("SELECT inventory_id, arrival_date, expiry_date FROM inventory ORDER BY inventory_id LIMIT 10")
-rows = cur.fetchall()
-print('Sample rows:')
-for r in rows:
-    print(r)
+    # Serve the reads from memory-mapped pages
+    cur.execute("PRAGMA mmap_size=268435456")
 
-con.close()
+    # Same expiry_date index the API server creates; it covers the IS NULL probe and count
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_inventory_expiry ON inventory(expiry_date)")
+    cur.execute("PRAGMA query_only=1")  # everything below only reads
+
+    # Probe for any remaining row first and only count when there is one
+    cur.execute("SELECT 1 FROM inventory WHERE expiry_date IS NULL LIMIT 1")
+    if cur.fetchone() is None:
+        nulls = 0
+    else:
+        cur.execute("SELECT COUNT(*) FROM inventory WHERE expiry_date IS NULL")
+        nulls = cur.fetchone()[0]
+    print('NULL expiry remaining:', nulls)
+
+    cur.execute("SELECT inventory_id, arrival_date, expiry_date FROM inventory ORDER BY inventory_id LIMIT 10")
+    rows = cur.fetchall()
+    print('Sample rows:')
+    for r in rows:
+        print(r)